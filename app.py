@@ -7,13 +7,18 @@ using OpenAI API with editable prompts and real-time processing.
 """
 
 import streamlit as st
+import asyncio
 import json
-import os
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-import tempfile
+from typing import Dict, List, Optional, Any, Tuple
 from extractor_openai import ISECAPIExtractor, ExtractionResult
 
+# Directory holding config.json and the prompt files
+_BASE_DIR = Path(__file__).parent
+
+# Uploads with more files than this default to OpenAI Batch API mode
+BATCH_MODE_MIN_FILES = 5
+
 # Configure page
 st.set_page_config(
     page_title="ISEC Contract Note Extractor",
@@ -22,46 +27,42 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load configuration
+# Load configuration. The cached readers raise on a missing file instead of returning a fallback,
+# because Streamlit does not cache exceptions: a restored file is picked up on the next rerun
+@st.cache_data(ttl=3600)
+def _read_config() -> Dict[str, Any]:
+    """Read and parse config.json."""
+    with open(_BASE_DIR / 'config.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+@st.cache_data(ttl=3600)
+def _read_prompt(prompt_file: str) -> str:
+    """Read a prompt file relative to the app directory."""
+    with open(_BASE_DIR / prompt_file, 'r', encoding='utf-8') as f:
+        return f.read()
+
 def load_config() -> Dict[str, Any]:
     """Load configuration from config.json file."""
-    config_path = Path(__file__).parent / 'config.json'
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _read_config()
     except FileNotFoundError:
         st.error("Configuration file not found: config.json")
         return {}
 
-def load_system_prompt() -> str:
-    """Load the system prompt from file."""
+def load_prompts() -> Tuple[str, str]:
+    """Load the system and position prompts (the minimal prompt doubles as the position prompt)."""
     config = load_config()
     if not config:
-        return ""
+        return "", ""
 
     prompt_file = config["files"]["system_prompt"]
-    prompt_path = Path(__file__).parent / prompt_file
     try:
-        with open(prompt_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        prompt = _read_prompt(prompt_file)
     except FileNotFoundError:
         st.error(f"System prompt file not found: {prompt_file}")
-        return ""
+        return "", ""
 
-def load_position_prompt() -> str:
-    """Load the position prompt (using minimal prompt as position prompt)."""
-    config = load_config()
-    if not config:
-        return ""
-
-    prompt_file = config["files"]["system_prompt"]  # Using minimal as position prompt
-    prompt_path = Path(__file__).parent / prompt_file
-    try:
-        with open(prompt_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    except FileNotFoundError:
-        st.error(f"Position prompt file not found: {prompt_file}")
-        return ""
+    return prompt, prompt
 
 def main():
     """Main Streamlit application."""
@@ -75,10 +76,11 @@ def main():
         st.session_state.processing_status = None
     if 'uploaded_files' not in st.session_state:
         st.session_state.uploaded_files = []
+    if 'batch_id' not in st.session_state:
+        st.session_state.batch_id = None
 
     # Load default prompts
-    default_system_prompt = load_system_prompt()
-    default_position_prompt = load_position_prompt()
+    default_system_prompt, default_position_prompt = load_prompts()
 
     # Create two columns layout
     col1, col2 = st.columns([1, 1])
@@ -129,18 +131,39 @@ def main():
             help="Upload one or more ISEC contract note PDF files"
         )
 
+        # Batch Mode
+        batch_mode = st.checkbox(
+            "Batch mode",
+            value=len(uploaded_files or []) > BATCH_MODE_MIN_FILES,
+            help="Submit all PDFs as one OpenAI Batch API job. Costs about half as much but results may take up to 24 hours."
+        )
+
         # Process Button
         if st.button("🔍 Extract Data", type="primary", use_container_width=True):
             if not uploaded_files:
                 st.error("Please upload at least one PDF file.")
             elif not system_prompt.strip():
                 st.error("Please provide a system prompt.")
+            elif batch_mode:
+                submit_batch_job(uploaded_files, system_prompt, position_prompt, selected_model)
             else:
                 process_pdfs(uploaded_files, system_prompt, position_prompt, selected_model)
 
+        # Delete PDFs kept on OpenAI for re-extraction
+        if st.button("🗑️ Clear uploads", use_container_width=True, help="Delete PDFs this app has uploaded to OpenAI for reuse"):
+            try:
+                deleted = ISECAPIExtractor(model=selected_model).clear_uploaded_files()
+                st.success(f"Deleted {deleted} uploaded files.")
+            except Exception as e:
+                st.error(f"Failed to clear uploads: {str(e)}")
+
     with col2:
         st.header("Results")
 
+        # Poll a pending batch job on every rerun
+        if st.session_state.batch_id:
+            poll_batch_job()
+
         # Display processing status
         if st.session_state.processing_status:
             if st.session_state.processing_status == "processing":
@@ -149,50 +172,102 @@ def main():
                 st.success("✅ Processing completed!")
             elif st.session_state.processing_status == "error":
                 st.error("❌ Processing failed. Check errors below.")
+            elif st.session_state.processing_status == "batch_pending":
+                st.info(f"⏳ Batch job {st.session_state.batch_id} is {st.session_state.batch_status}. Results can take up to 24 hours.")
+                st.button("🔄 Refresh batch status")
 
         # Display extracted data
         if st.session_state.extracted_data:
             st.subheader("Extracted JSON Data")
-            st.json(st.session_state.extracted_data)
+            # One collapsible block per file so a large batch isn't all expanded on first paint
+            single_file = len(st.session_state.extracted_data) == 1
+            for file_name, data in st.session_state.extracted_data.items():
+                with st.expander(file_name, expanded=single_file):
+                    st.json(data if isinstance(data, dict) else {file_name: data})
         else:
             st.info("No data extracted yet. Upload PDFs and click 'Extract Data' to begin.")
 
+def submit_batch_job(uploaded_files: List[Any], system_prompt: str, position_prompt: str, model: str):
+    """Submit uploaded PDF files as one OpenAI Batch API job."""
+    try:
+        # Read each upload once and hand the bytes straight to the extractor
+        file_names = [uploaded_file.name for uploaded_file in uploaded_files]
+        pdf_contents = [uploaded_file.getvalue() for uploaded_file in uploaded_files]
+
+        extractor = ISECAPIExtractor(model=model)
+        batch_id, custom_ids = extractor.submit_batch(
+            file_names, system_prompt=system_prompt, position_prompt=position_prompt, pdf_contents=pdf_contents
+        )
+
+        # Map each batch request back to its uploaded file name
+        st.session_state.batch_id = batch_id
+        st.session_state.batch_model = model
+        st.session_state.batch_status = "submitted"
+        st.session_state.batch_files = custom_ids
+        st.session_state.processing_status = "batch_pending"
+        st.session_state.extracted_data = None
+
+    except Exception as e:
+        st.error(f"Batch submission failed: {str(e)}")
+        st.session_state.processing_status = "error"
+        st.session_state.extracted_data = {"error": str(e)}
+
+def poll_batch_job():
+    """Check the pending batch job and store its results once completed."""
+    try:
+        extractor = ISECAPIExtractor(model=st.session_state.batch_model)
+        status, results = extractor.retrieve_batch(st.session_state.batch_id, custom_ids=st.session_state.batch_files)
+        st.session_state.batch_status = status
+
+        if status in ("failed", "expired", "cancelled"):
+            st.session_state.extracted_data = {"error": f"Batch job {st.session_state.batch_id} {status}"}
+            st.session_state.processing_status = "error"
+            st.session_state.batch_id = None
+        elif results is not None:
+            st.session_state.extracted_data = {
+                st.session_state.batch_files.get(custom_id, custom_id): result.data if result.success else {"errors": result.errors}
+                for custom_id, result in results.items()
+            }
+            # Every submitted request has a result here, failed ones included
+            if results and all(result.success for result in results.values()):
+                st.session_state.processing_status = "completed"
+            else:
+                st.session_state.processing_status = "error"
+            st.session_state.batch_id = None
+
+    except Exception as e:
+        st.error(f"Batch status check failed: {str(e)}")
+
 def process_pdfs(uploaded_files: List[Any], system_prompt: str, position_prompt: str, model: str):
-    """Process uploaded PDF files and extract data."""
+    """Process uploaded PDF files concurrently and extract data."""
     try:
         st.session_state.processing_status = "processing"
 
-        # Save uploaded files temporarily
-        temp_files = []
-        for uploaded_file in uploaded_files:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                tmp_file.write(uploaded_file.getvalue())
-                temp_files.append(tmp_file.name)
+        # Read each upload once and hand the bytes straight to the extractor
+        file_names = [uploaded_file.name for uploaded_file in uploaded_files]
+        pdf_contents = [uploaded_file.getvalue() for uploaded_file in uploaded_files]
 
         # Initialize extractor with custom prompts
         extractor = ISECAPIExtractor(model=model)
 
-        # For now, process only the first file (can be extended for multiple files)
-        pdf_path = temp_files[0]
+        # Extract all files concurrently; Streamlit is sync, so drive the event loop once per click
+        results = asyncio.run(
+            extractor.extract_batch(
+                file_names, system_prompt=system_prompt, position_prompt=position_prompt, pdf_contents=pdf_contents
+            )
+        )
 
-        # Extract data with custom prompts
-        result = extractor.extract_from_pdf(pdf_path, system_prompt=system_prompt, position_prompt=position_prompt)
+        # Store results keyed by uploaded file name
+        extracted_data = {}
+        for file_name, result in zip(file_names, results):
+            extracted_data[file_name] = result.data if result.success else {"errors": result.errors}
 
-        # Store results
-        if result.success:
-            st.session_state.extracted_data = result.data
+        st.session_state.extracted_data = extracted_data
+        if all(result.success for result in results):
             st.session_state.processing_status = "completed"
         else:
-            st.session_state.extracted_data = {"errors": result.errors}
             st.session_state.processing_status = "error"
 
-        # Clean up temporary files
-        for temp_file in temp_files:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
-
     except Exception as e:
         st.error(f"Processing failed: {str(e)}")
         st.session_state.processing_status = "error"
@@ -0,0 +1,81 @@
+"""
+Persistent LLM Response Cache for ISEC Contract Note Extraction
+
+Stores parsed extraction responses in SQLite so re-running an identical PDF with the same
+prompts and model is a local lookup instead of an OpenAI round-trip.
+"""
+
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever prompt handling, the schema or response parsing change in a way that should invalidate cached extractions
+PROMPT_VERSION = "v1"
+
+class CacheEntry(NamedTuple):
+    """A cached response and the Unix time it was stored."""
+    response: str
+    created_at: int
+
+class LLMCache:
+    """
+    SQLite-backed response cache keyed by (input hash, prompt version, model).
+
+    Each operation opens its own short-lived connection, so the cache can be used from
+    worker threads (e.g. asyncio.to_thread) without sharing a connection between them.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(self._connect()) as conn, conn:
+                # WAL lets concurrent extractions read while another one writes
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    "input_hash TEXT NOT NULL, prompt_version TEXT NOT NULL, model TEXT NOT NULL, "
+                    "response TEXT NOT NULL, created_at INTEGER NOT NULL, expires_at INTEGER, "
+                    "PRIMARY KEY (input_hash, prompt_version, model))"
+                )
+                conn.execute("DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (int(time.time()),))
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Failed to initialize extraction cache {self.db_path}: {str(e)}")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get(self, input_hash: str, model: str, prompt_version: str = PROMPT_VERSION) -> Optional[CacheEntry]:
+        """Return the unexpired cached response for this input, or None on a miss or database error."""
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT response, created_at FROM llm_cache "
+                    "WHERE input_hash = ? AND prompt_version = ? AND model = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (input_hash, prompt_version, model, int(time.time()))
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Ignoring unreadable extraction cache: {str(e)}")
+            return None
+
+        return CacheEntry(*row) if row else None
+
+    def set(self, input_hash: str, model: str, response: str, ttl: Optional[float] = None,
+            prompt_version: str = PROMPT_VERSION):
+        """Store a response, replacing any previous one; ttl is in seconds (None keeps it forever)."""
+        now = int(time.time())
+        expires_at = None if ttl is None else now + int(ttl)
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache "
+                    "(input_hash, prompt_version, model, response, created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (input_hash, prompt_version, model, response, now, expires_at)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to write extraction cache: {str(e)}")
@@ -1,13 +1,23 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+# Only read .env when the key isn't already exported
 key = os.getenv('OPENAI_API_KEY')
+if not key:
+    from dotenv import load_dotenv
+    load_dotenv()
+    key = os.getenv('OPENAI_API_KEY')
 
-print(f'Length: {len(key)}')
-print(f'Has spaces: {" " in key}')
-print(f'Has newlines: {chr(10) in key or chr(13) in key}')
-print(f'First char code: {ord(key[0])}')
-print(f'Last char code: {ord(key[-1])}')
-print(f'Key repr: {repr(key[:30])}...{repr(key[-30:])}')
+# Gather all stats in one pass over the key
+has_spaces = has_newlines = False
+for c in key:
+    has_spaces |= c == ' '
+    has_newlines |= c in '\n\r'
 
+print(
+    f'Length: {len(key)}\n'
+    f'Has spaces: {has_spaces}\n'
+    f'Has newlines: {has_newlines}\n'
+    f'First char code: {ord(key[0])}\n'
+    f'Last char code: {ord(key[-1])}\n'
+    f'Key repr: {repr(key[:30])}...{repr(key[-30:])}'
+)
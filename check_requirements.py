@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Exit with status 1 if any package listed in requirements.txt is not installed.
+
+Used by run_app.sh and run_app.bat. Reads installed distribution metadata only; no package code is imported.
+"""
+
+import re
+import sys
+from importlib.metadata import distributions
+from pathlib import Path
+
+def normalize(name: str) -> str:
+    """Normalize a distribution name as PEP 503 does (runs of -, _ and . become a single -)."""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+def main() -> int:
+    requirements_path = Path(__file__).parent / 'requirements.txt'
+    installed = {normalize(dist.metadata['Name'] or '') for dist in distributions()}
+
+    missing = []
+    for line in requirements_path.read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        # Keep only the project name, dropping version specifiers, extras and environment markers
+        name = re.split(r'[<>=!~;\[ ]', line)[0]
+        if normalize(name) not in installed:
+            missing.append(name)
+
+    if missing:
+        print(f"Missing packages: {', '.join(missing)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
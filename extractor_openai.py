@@ -6,32 +6,69 @@ A comprehensive system for extracting financial data from ISEC (ICICI Securities
 This extractor uploads the PDF directly to OpenAI and uses GPT models for analysis.
 """
 
+import asyncio
+import contextlib
+import copy
+import functools
+import hashlib
 import json
 import logging
 import re
 import os
-import tempfile
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+import threading
+import time
+from typing import Dict, List, Optional, Any, Tuple, Union, BinaryIO, Iterable
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, replace
+from io import BytesIO
 from pathlib import Path
 from datetime import datetime
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, BadRequestError, NotFoundError
 from pypdf import PdfReader, PdfWriter
+from cache import LLMCache, PROMPT_VERSION
 
-# Load environment variables from .env file
+# Directory holding config.json, prompts, schemas and .env
+_BASE_DIR = Path(__file__).parent
+
+# The SDK's aiohttp transport is optional (pip install "openai[aiohttp]"); it holds up better than the default httpx pool under many concurrent requests
+try:
+    from openai import DefaultAioHttpClient
+except ImportError:
+    DefaultAioHttpClient = None
+
+# orjson is optional; it parses and serializes JSON several times faster than the json module
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
+    import orjson
 except ImportError:
-    # If python-dotenv is not installed, try manual .env loading
-    env_path = Path(__file__).parent / '.env'
-    if env_path.exists():
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key.strip()] = value.strip()
+    orjson = None
+
+# tiktoken is optional; without it prompt tokens are estimated at 4 characters per token
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# PyMuPDF is optional; it reduces large PDFs much faster than pure-Python pypdf
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+# Load environment variables from .env file, unless the API key is already exported
+if not os.environ.get("OPENAI_API_KEY"):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        # If python-dotenv is not installed, try manual .env loading
+        env_path = _BASE_DIR / '.env'
+        if env_path.exists():
+            with open(env_path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        os.environ[key.strip()] = value.strip()
 
 # Configure logging
 logging.basicConfig(
@@ -40,6 +77,83 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Outermost {...} span in a response
+_JSON_OBJECT_RE = re.compile(r'\{[\s\S]*\}')
+
+_ISIN_RE = re.compile(r'^[A-Z]{2}[0-9A-Z]{10}$')
+
+# Decoder used to find where the first complete JSON value ends
+_JSON_DECODER = json.JSONDecoder()
+
+# Uploaded OpenAI file IDs keyed by (API key, SHA-256 of the PDF bytes), since files belong to one account:
+# (file_id, file_size_mb, reduced_size_mb)
+_FILE_ID_CACHE: Dict[Tuple[str, str], Tuple[str, float, Optional[float]]] = {}
+
+# Parsed extractions kept in process above the SQLite cache, keyed by (cache key, model, PROMPT_VERSION): (data, created_at)
+_MEMORY_CACHE: "OrderedDict[Tuple[str, str, str], Tuple[Dict[str, Any], int]]" = OrderedDict()
+_MEMORY_CACHE_MAX = 128
+_MEMORY_CACHE_LOCK = threading.Lock()
+
+# Fields checked by the validators
+_REQUIRED_HEADER_FIELDS = (
+    'contract_note_no', 'trade_date', 'settlement_no',
+    'settlement_date', 'client_id', 'client_name'
+)
+_NUMERIC_TRANSACTION_FIELDS = (
+    'buy_quantity', 'sell_quantity', 'total_quantity',
+    'buy_weighted_average_price', 'sell_weighted_average_price',
+    'buy_net_payable_receivable', 'sell_net_payable_receivable',
+    'total_net_payable_receivable'
+)
+_REQUIRED_OBLIGATION_FIELDS = frozenset((
+    'pay_out_obligation', 'taxable_value_of_supply',
+    'gst_details', 'securities_transaction_tax', 'stamp_duty',
+    'net_amount_receivable_by_client', 'net_amount_to_be_credited_in_bank'
+))
+_TAXABLE_VALUE_FIELDS = frozenset((
+    'total_brokerage', 'exchange_transaction_charges',
+    'sebi_turnover_fees', 'total_taxable_value'
+))
+_GST_DETAIL_FIELDS = frozenset((
+    'cgst_rate', 'cgst_brokerage_amount', 'cgst_charges_amount', 'cgst_total_amount',
+    'sgst_rate', 'sgst_brokerage_amount', 'sgst_charges_amount', 'sgst_total_amount',
+    'igst_rate', 'igst_brokerage_amount', 'igst_charges_amount', 'igst_total_amount'
+))
+
+@functools.lru_cache(maxsize=8)
+def _get_openai_client(api_key: str, max_retries: int) -> OpenAI:
+    """Return one shared OpenAI client per API key, so extractor instances reuse its connection pool."""
+    return OpenAI(api_key=api_key, max_retries=max_retries)
+
+def _json_loads(text: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson when available. Both raise json.JSONDecodeError on bad input."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def _json_dumps(value: Any) -> str:
+    """Serialize JSON compactly with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+def _read_text(path: Path) -> str:
+    """Read a text file, reusing the cached contents until its modification time changes."""
+    return _read_text_cached(path, path.stat().st_mtime_ns)
+
+def _read_json(path: Path) -> Any:
+    """Parse a JSON file, reusing the cached object until its modification time changes. Treat the result as read-only."""
+    return _read_json_cached(path, path.stat().st_mtime_ns)
+
+@functools.lru_cache(maxsize=32)
+def _read_text_cached(path: Path, mtime_ns: int) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+@functools.lru_cache(maxsize=32)
+def _read_json_cached(path: Path, mtime_ns: int) -> Any:
+    return _json_loads(_read_text_cached(path, mtime_ns))
+
 @dataclass
 class ExtractionResult:
     """Data class to hold extraction results with metadata"""
@@ -49,6 +163,32 @@ class ExtractionResult:
     warnings: List[str]
     metadata: Dict[str, Any]
 
+class TokenBucket:
+    """
+    Client-side tokens-per-minute limiter for concurrent OpenAI requests.
+
+    Requests reserve their estimated tokens up front and sleep off any deficit,
+    so bursts are spread out before OpenAI has to reject them with 429s.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.tokens_per_minute = tokens_per_minute
+        self.tokens = float(tokens_per_minute)
+        self.updated_at = time.monotonic()
+
+    async def acquire(self, n_tokens: int):
+        """Reserve n_tokens, waiting until the bucket has refilled enough to cover them."""
+        # Refill and reserve without yielding, so concurrent callers queue up behind each other
+        now = time.monotonic()
+        self.tokens = min(self.tokens_per_minute, self.tokens + (now - self.updated_at) * self.tokens_per_minute / 60)
+        self.updated_at = now
+        self.tokens -= min(n_tokens, self.tokens_per_minute)
+
+        if self.tokens < 0:
+            wait_seconds = -self.tokens / self.tokens_per_minute * 60
+            logger.info(f"Rate limiting: waiting {wait_seconds:.1f}s for {n_tokens} tokens")
+            await asyncio.sleep(wait_seconds)
+
 class ISECAPIExtractor:
     """
     Extractor for ISEC (ICICI Securities) contract notes using OpenAI API.
@@ -70,18 +210,92 @@ class ISECAPIExtractor:
         if not api_key:
             raise ValueError(f"OpenAI API key not found. Set {self.config['openai']['api_key_env_var']} environment variable or provide api_key parameter.")
 
-        self.client = OpenAI(api_key=api_key)
+        # The SDK retries connection errors, 408/409/429 and 5xx with jittered exponential backoff
+        # (honouring Retry-After), and raises 400/401/403 immediately
+        self.max_retries = self.config["extraction"].get("retry_attempts", 2)
+        self.api_key = api_key
+        self.client = _get_openai_client(api_key, self.max_retries)
+        cache_config = self.config.get("cache", {})
+        self.cache = LLMCache(
+            _BASE_DIR / cache_config.get("directory", ".extraction_cache") / "llm_cache.sqlite3"
+        ) if cache_config.get("enabled", False) else None
+        ttl_days = cache_config.get("ttl_days")
+        self.cache_ttl_seconds = None if ttl_days is None else ttl_days * 86400
+        self.token_bucket = TokenBucket(self.config["openai"].get("tokens_per_minute", 200000))
+        # Token counts of custom system prompts, so each distinct prompt is encoded once
+        self._system_prompt_token_counts: Dict[str, int] = {}
         self.model = model or self.config["openai"]["default_model"]
-        self.system_prompt = self._load_system_prompt()
-        self.output_schema = self._load_output_schema()
-        self.full_schema = self._load_full_schema()
+
+    # Prompts, schemas and values derived from them are loaded on first use and then kept, so an
+    # extractor built only to poll a batch or clear uploads never reads them or loads tiktoken
+
+    @functools.cached_property
+    def system_prompt(self) -> str:
+        return self._load_system_prompt()
+
+    @functools.cached_property
+    def output_schema(self) -> Dict[str, Any]:
+        return self._load_output_schema()
+
+    @functools.cached_property
+    def full_schema(self) -> Dict[str, Any]:
+        return self._load_full_schema()
+
+    @functools.cached_property
+    def response_schema(self) -> Dict[str, Any]:
+        return self._to_strict_schema(self.output_schema)
+
+    @functools.cached_property
+    def structured_outputs(self) -> bool:
+        return bool(self.config["openai"].get("structured_outputs", False) and self.response_schema)
+
+    @functools.cached_property
+    def schema_text(self) -> str:
+        return _json_dumps(self.output_schema)
+
+    @functools.cached_property
+    def token_encoding(self) -> Optional[Any]:
+        return self._load_token_encoding()
+
+    @functools.cached_property
+    def system_prompt_tokens(self) -> int:
+        return self._count_tokens(self.system_prompt)
+
+    @functools.cached_property
+    def extraction_prompt(self) -> str:
+        return self._prepare_extraction_prompt()
+
+    @functools.cached_property
+    def extraction_prompt_tokens(self) -> int:
+        return self._count_tokens(self.extraction_prompt)
+
+    @contextlib.asynccontextmanager
+    async def _async_client_session(self):
+        """
+        Open an AsyncOpenAI client on the running event loop and close it afterwards.
+
+        The client is bound to its event loop, so each async call opens its own and passes it down
+        explicitly rather than sharing one through the extractor.
+        """
+        async with AsyncOpenAI(api_key=self.api_key, max_retries=self.max_retries,
+                               http_client=self._async_http_client()) as client:
+            yield client
+
+    def _async_http_client(self) -> Optional[Any]:
+        """Return an aiohttp-backed HTTP client for AsyncOpenAI if the aiohttp extra is installed, else None for the SDK default."""
+        if DefaultAioHttpClient is None:
+            return None
+        try:
+            return DefaultAioHttpClient()
+        except RuntimeError:
+            # The SDK exports the class but raises when aiohttp itself is missing
+            return None
 
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from config.json file."""
-        config_path = Path(__file__).parent / 'config.json'
+        config_path = _BASE_DIR / 'config.json'
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _read_json(config_path)
         except FileNotFoundError:
             logger.error("Configuration file not found: config.json")
             raise FileNotFoundError("Required config.json file not found. Please ensure the file exists in the same directory as the extractor.")
@@ -94,10 +308,9 @@ class ISECAPIExtractor:
         else:
             prompt_file = self.config["files"]["full_system_prompt"]
 
-        prompt_path = Path(__file__).parent / prompt_file
+        prompt_path = _BASE_DIR / prompt_file
         try:
-            with open(prompt_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return _read_text(prompt_path)
         except FileNotFoundError:
             logger.error(f"System prompt file not found: {prompt_file}")
             raise FileNotFoundError(f"Required {prompt_file} file not found. Please ensure the file exists in the same directory as the extractor.")
@@ -106,10 +319,9 @@ class ISECAPIExtractor:
         """Load the output schema from file."""
         # Use compact schema for prompts, full schema for validation
         schema_file = self.config["files"]["compact_schema"]
-        schema_path = Path(__file__).parent / schema_file
+        schema_path = _BASE_DIR / schema_file
         try:
-            with open(schema_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _read_json(schema_path)
         except FileNotFoundError:
             logger.error(f"Schema file not found: {schema_file}")
             return {}
@@ -117,15 +329,26 @@ class ISECAPIExtractor:
     def _load_full_schema(self) -> Dict[str, Any]:
         """Load the full schema for validation."""
         schema_file = self.config["files"]["full_schema"]
-        schema_path = Path(__file__).parent / schema_file
+        schema_path = _BASE_DIR / schema_file
         try:
-            with open(schema_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _read_json(schema_path)
         except FileNotFoundError:
             logger.warning(f"Full schema file not found: {schema_file}, using compact schema for validation")
             return self.output_schema
 
-    def extract_from_pdf(self, pdf_path: str, system_prompt: str = None, position_prompt: str = None) -> ExtractionResult:
+    def _to_strict_schema(self, schema: Any) -> Any:
+        """Copy a JSON schema with additionalProperties disabled on every object, as strict structured outputs require."""
+        if isinstance(schema, dict):
+            strict_schema = {key: self._to_strict_schema(value) for key, value in schema.items()}
+            if strict_schema.get("type") == "object":
+                strict_schema["additionalProperties"] = False
+            return strict_schema
+        if isinstance(schema, list):
+            return [self._to_strict_schema(item) for item in schema]
+        return schema
+
+    def extract_from_pdf(self, pdf_path: str, system_prompt: str = None, position_prompt: str = None,
+                         pdf_bytes: Optional[bytes] = None) -> ExtractionResult:
         """
         Main extraction method using OpenAI API.
 
@@ -133,184 +356,648 @@ class ISECAPIExtractor:
             pdf_path: Path to the PDF file
             system_prompt: Optional custom system prompt (overrides default)
             position_prompt: Optional custom position prompt (combined with system prompt)
+            pdf_bytes: Optional PDF contents already in memory (if None, read once from pdf_path)
 
         Returns:
             ExtractionResult with extracted data and metadata
         """
         errors = []
         warnings = []
-        reduced_pdf_path = None
-        original_pdf_path = pdf_path
 
         try:
-            # Check file size and reduce if necessary
-            file_size_mb = os.path.getsize(pdf_path) / (1024 * 1024)
-            pdf_config = self.config.get("pdf_reduction", {})
-            reduction_enabled = pdf_config.get("enabled", True)
-            max_size_mb = pdf_config.get("max_file_size_mb", 50)
-
-            logger.info(f"PDF file size: {file_size_mb:.2f}MB")
-            logger.info(f"PDF reduction enabled: {reduction_enabled}, threshold: {max_size_mb}MB")
-
-            if reduction_enabled and file_size_mb > max_size_mb:
-                logger.info(f"PDF size exceeds threshold ({max_size_mb}MB), reducing size...")
-                try:
-                    reduced_pdf_path = self._reduce_pdf_size(pdf_path)
-                    pdf_path = reduced_pdf_path
-                    reduced_size_mb = os.path.getsize(pdf_path) / (1024 * 1024)
-                    warnings.append(f"PDF was reduced from {file_size_mb:.2f}MB to {reduced_size_mb:.2f}MB")
-                except Exception as reduce_error:
-                    logger.error(f"Failed to reduce PDF size: {str(reduce_error)}")
-                    errors.append(f"PDF size reduction failed: {str(reduce_error)}")
-                    return ExtractionResult(
-                        success=False,
-                        data={},
-                        errors=errors,
-                        warnings=warnings,
-                        metadata={}
-                    )
-
-            # Upload PDF to OpenAI
-            file_id = self._upload_pdf(pdf_path)
-            if not file_id:
-                errors.append("Failed to upload PDF to OpenAI")
-                return ExtractionResult(
-                    success=False,
-                    data={},
-                    errors=errors,
-                    warnings=warnings,
-                    metadata={}
-                )
+            if pdf_bytes is None:
+                with open(pdf_path, "rb") as f:
+                    pdf_bytes = f.read()
+
+            # Hash the PDF once; the digest keys both the extraction cache and upload reuse
+            digest = hashlib.sha256(pdf_bytes).hexdigest()
+
+            # Return a previous extraction of the same PDF and prompts without calling OpenAI
+            cache_key, cached_result = self._check_cache(digest, pdf_path, system_prompt, position_prompt)
+            if cached_result:
+                return cached_result
+
+            # Upload PDF to OpenAI, reusing an earlier upload of the same bytes
+            if (self.api_key, digest) in _FILE_ID_CACHE:
+                file_id, file_size_mb, reduced_size_mb = _FILE_ID_CACHE[(self.api_key, digest)]
+                logger.info(f"Reusing uploaded file: {file_id}")
+            else:
+                file_size_mb, reduced_pdf = self._prepare_pdf(pdf_bytes, errors, warnings)
+                if errors:
+                    return self._failed_result(errors, warnings)
+
+                file_id = self._upload_pdf(pdf_bytes if reduced_pdf is None else reduced_pdf, os.path.basename(pdf_path))
+                if not file_id:
+                    errors.append("Failed to upload PDF to OpenAI")
+                    return self._failed_result(errors, warnings)
+                reduced_size_mb = self._remember_upload(digest, file_id, file_size_mb, reduced_pdf)
 
             # Extract data using OpenAI with custom prompts if provided
             extracted_data = self._extract_with_openai(file_id, system_prompt, position_prompt)
 
-            # Validate the extracted data
-            validation_errors = self._validate_extracted_data(extracted_data)
-            errors.extend(validation_errors)
+            result = self._build_result(extracted_data, errors, warnings, pdf_path, file_id, file_size_mb, reduced_size_mb)
+            self._store_cached_result(cache_key, result)
+            return result
 
-            success = len(errors) == 0
+        except Exception as e:
+            return self._exception_result(e, warnings, pdf_path)
 
-            # Create metadata
-            metadata = {
-                "extraction_timestamp": datetime.now().isoformat(),
-                "pdf_path": original_pdf_path,
-                "model_used": self.model,
-                "file_id": file_id,
-                "total_transactions": len(extracted_data.get('transactions', [])),
-                "validation_errors": len(errors),
-                "original_file_size_mb": file_size_mb,
-                "file_reduced": reduced_pdf_path is not None
-            }
+    async def extract_from_pdf_async(self, pdf_path: str, system_prompt: str = None, position_prompt: str = None,
+                                     pdf_bytes: Optional[bytes] = None) -> ExtractionResult:
+        """
+        Asynchronous variant of extract_from_pdf using the AsyncOpenAI client.
 
-            if reduced_pdf_path:
-                metadata["reduced_file_size_mb"] = os.path.getsize(reduced_pdf_path) / (1024 * 1024)
+        Each call opens and closes its own client; run several PDFs through extract_batch so they share one.
 
-            return ExtractionResult(
-                success=success,
-                data=extracted_data,
-                errors=errors,
-                warnings=warnings,
-                metadata=metadata
-            )
+        Args:
+            pdf_path: Path to the PDF file
+            system_prompt: Optional custom system prompt (overrides default)
+            position_prompt: Optional custom position prompt (combined with system prompt)
+            pdf_bytes: Optional PDF contents already in memory (if None, read once from pdf_path)
+
+        Returns:
+            ExtractionResult with extracted data and metadata
+        """
+        async with self._async_client_session() as client:
+            return await self._extract_from_pdf_async(client, pdf_path, system_prompt, position_prompt, pdf_bytes)
+
+    async def _extract_from_pdf_async(self, client: AsyncOpenAI, pdf_path: str, system_prompt: str = None,
+                                      position_prompt: str = None, pdf_bytes: Optional[bytes] = None) -> ExtractionResult:
+        """Run extract_from_pdf_async with an already open async client."""
+        errors = []
+        warnings = []
+
+        try:
+            # Disk I/O, hashing and PDF reduction run in worker threads so other extractions' network calls keep moving
+            if pdf_bytes is None:
+                pdf_bytes = await asyncio.to_thread(Path(pdf_path).read_bytes)
+
+            # Hash the PDF once; the digest keys both the extraction cache and upload reuse. hashlib
+            # releases the GIL, so hashing in a worker thread overlaps with other PDFs' uploads and completions
+            digest = (await asyncio.to_thread(hashlib.sha256, pdf_bytes)).hexdigest()
+
+            # Return a previous extraction of the same PDF and prompts without calling OpenAI
+            cache_key, cached_result = await asyncio.to_thread(self._check_cache, digest, pdf_path, system_prompt, position_prompt)
+            if cached_result:
+                return cached_result
+
+            # Upload PDF to OpenAI, reusing an earlier upload of the same bytes
+            if (self.api_key, digest) in _FILE_ID_CACHE:
+                file_id, file_size_mb, reduced_size_mb = _FILE_ID_CACHE[(self.api_key, digest)]
+                logger.info(f"Reusing uploaded file: {file_id}")
+            else:
+                file_size_mb, reduced_pdf = await asyncio.to_thread(self._prepare_pdf, pdf_bytes, errors, warnings)
+                if errors:
+                    return self._failed_result(errors, warnings)
+
+                file_id = await self._upload_pdf_async(client, pdf_bytes if reduced_pdf is None else reduced_pdf, os.path.basename(pdf_path))
+                if not file_id:
+                    errors.append("Failed to upload PDF to OpenAI")
+                    return self._failed_result(errors, warnings)
+                reduced_size_mb = self._remember_upload(digest, file_id, file_size_mb, reduced_pdf)
+
+            # Extract data using OpenAI with custom prompts if provided
+            extracted_data = await self._extract_with_openai_async(client, file_id, system_prompt, position_prompt)
+
+            result = self._build_result(extracted_data, errors, warnings, pdf_path, file_id, file_size_mb, reduced_size_mb)
+            await asyncio.to_thread(self._store_cached_result, cache_key, result)
+            return result
 
         except Exception as e:
-            logger.error(f"Extraction failed: {str(e)}")
-            return ExtractionResult(
-                success=False,
-                data={},
-                errors=[f"Extraction failed: {str(e)}"],
-                warnings=warnings,
+            return self._exception_result(e, warnings, pdf_path)
+
+    async def extract_batch(self, pdf_paths: List[str], system_prompt: str = None, position_prompt: str = None,
+                            concurrency: int = None, pdf_contents: Optional[List[bytes]] = None) -> List[ExtractionResult]:
+        """
+        Extract data from several PDFs concurrently.
+
+        Args:
+            pdf_paths: Paths to the PDF files
+            system_prompt: Optional custom system prompt (overrides default)
+            position_prompt: Optional custom position prompt (combined with system prompt)
+            concurrency: Maximum number of in-flight extractions (if None, uses config file)
+            pdf_contents: Optional PDF contents matching pdf_paths (if None, each file is read from disk)
+
+        Returns:
+            List of ExtractionResult in the same order as pdf_paths
+        """
+        concurrency = concurrency or self.config["extraction"].get("max_concurrency", 8)
+        semaphore = asyncio.Semaphore(concurrency)
+        pdf_contents = pdf_contents or [None] * len(pdf_paths)
+
+        logger.info(f"Extracting {len(pdf_paths)} PDFs with concurrency {concurrency}")
+        # One client per call: it is bound to this event loop and closed once every extraction is done
+        async with self._async_client_session() as client:
+            async def extract_one(pdf_path: str, pdf_bytes: Optional[bytes]) -> ExtractionResult:
+                async with semaphore:
+                    return await self._extract_from_pdf_async(client, pdf_path, system_prompt, position_prompt, pdf_bytes)
+
+            return await asyncio.gather(*(extract_one(pdf_path, pdf_bytes) for pdf_path, pdf_bytes in zip(pdf_paths, pdf_contents)))
+
+    def submit_batch(self, pdf_paths: List[str], system_prompt: str = None, position_prompt: str = None,
+                     pdf_contents: Optional[List[bytes]] = None) -> Tuple[str, Dict[str, str]]:
+        """
+        Submit extraction of several PDFs as one OpenAI Batch API job.
+
+        Batch jobs complete within 24 hours at roughly half the token price,
+        which suits non-interactive multi-PDF workloads.
+
+        Args:
+            pdf_paths: Paths to the PDF files
+            system_prompt: Optional custom system prompt (overrides default)
+            position_prompt: Optional custom position prompt (combined with system prompt)
+            pdf_contents: Optional PDF contents matching pdf_paths (if None, each file is read from disk)
+
+        Returns:
+            Tuple of (batch ID, mapping of request custom_id to PDF path)
+        """
+        custom_ids = {}
+        pdf_contents = pdf_contents or [None] * len(pdf_paths)
+
+        for pdf_path, pdf_bytes in zip(pdf_paths, pdf_contents):
+            if pdf_bytes is None:
+                with open(pdf_path, "rb") as f:
+                    pdf_bytes = f.read()
+
+            errors = []
+            file_id = self._upload_for_batch(pdf_path, pdf_bytes, hashlib.sha256(pdf_bytes).hexdigest(), errors)
+            if not file_id:
+                raise RuntimeError("; ".join(errors))
+
+            # Identical PDFs share one upload and one request; the Batch API rejects duplicate custom_ids
+            custom_ids.setdefault(file_id, pdf_path)
+
+        return self._create_batch_job(custom_ids, system_prompt, position_prompt), custom_ids
+
+    def _create_batch_job(self, custom_ids: Dict[str, str], system_prompt: str = None, position_prompt: str = None) -> str:
+        """Create a Batch API job with one extraction request per uploaded file ID and return the batch ID."""
+        batch_lines = [
+            _json_dumps({
+                "custom_id": file_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._build_request_params(file_id, system_prompt, position_prompt)
+            })
+            for file_id in custom_ids
+        ]
+
+        # Upload the batch input straight from memory
+        batch_input = self.client.files.create(
+            file=("batch_input.jsonl", "\n".join(batch_lines).encode("utf-8"), "application/jsonl"),
+            purpose="batch"
+        )
+
+        batch = self.client.batches.create(
+            input_file_id=batch_input.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info(f"Submitted batch {batch.id} with {len(batch_lines)} requests")
+        return batch.id
+
+    def _upload_for_batch(self, pdf_path: str, pdf_bytes: bytes, digest: str, errors: List[str]) -> Optional[str]:
+        """Return the uploaded file ID for a batch request, uploading the PDF unless it already was; None with errors on failure."""
+        if (self.api_key, digest) in _FILE_ID_CACHE:
+            return _FILE_ID_CACHE[(self.api_key, digest)][0]
+
+        file_size_mb, reduced_pdf = self._prepare_pdf(pdf_bytes, errors, [])
+        if errors:
+            return None
+
+        file_id = self._upload_pdf(pdf_bytes if reduced_pdf is None else reduced_pdf, os.path.basename(pdf_path))
+        if not file_id:
+            errors.append(f"Failed to upload PDF to OpenAI: {pdf_path}")
+            return None
+        self._remember_upload(digest, file_id, file_size_mb, reduced_pdf)
+        return file_id
+
+    def retrieve_batch(self, batch_id: str,
+                       custom_ids: Optional[Iterable[str]] = None) -> Tuple[str, Optional[Dict[str, ExtractionResult]]]:
+        """
+        Poll an OpenAI Batch API job and collect its results once completed.
+
+        Args:
+            batch_id: ID returned by submit_batch
+            custom_ids: Optional custom_ids submitted in the batch; any without a result line are reported as failed
+
+        Returns:
+            Tuple of (batch status, results keyed by custom_id or None while the batch is not completed)
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        logger.info(f"Batch {batch_id} status: {batch.status}")
+        if batch.status != "completed":
+            return batch.status, None
+
+        # Successful requests are written to the output file and failed ones to the error file
+        records = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                records.extend(_json_loads(line) for line in self.client.files.content(file_id).iter_lines() if line.strip())
+
+        results = {}
+        for record in records:
+            custom_id = record["custom_id"]
+            response = record.get("response") or {}
+
+            if record.get("error") or response.get("status_code") != 200:
+                error = record.get("error") or response.get("body", {}).get("error")
+                results[custom_id] = self._failed_result([f"Batch request failed: {error}"], [])
+                continue
+
+            response_text = response["body"]["choices"][0]["message"]["content"]
+            extracted_data = self._parse_json_response(response_text) if response_text else {}
+            errors = self._validate_extracted_data(extracted_data)
+            results[custom_id] = ExtractionResult(
+                success=len(errors) == 0,
+                data=extracted_data,
+                errors=errors,
+                warnings=[],
                 metadata={
-                    "pdf_path": original_pdf_path,
-                    "extraction_timestamp": datetime.now().isoformat()
+                    "extraction_timestamp": datetime.now().isoformat(),
+                    "model_used": self.model,
+                    "file_id": custom_id,
+                    "batch_id": batch_id,
+                    "total_transactions": len(extracted_data.get('transactions', [])),
+                    "validation_errors": len(errors)
                 }
             )
 
-        finally:
-            # Clean up temporary files
-            if reduced_pdf_path:
-                self._cleanup_temp_file(reduced_pdf_path)
+        for custom_id in custom_ids or ():
+            if custom_id not in results:
+                results[custom_id] = self._failed_result([f"No result returned for this request in batch {batch_id}"], [])
+
+        return batch.status, results
 
-    def _reduce_pdf_size(self, pdf_path: str) -> str:
+    def extract_batch_offline(self, pdf_paths: List[str], system_prompt: str = None, position_prompt: str = None,
+                              poll_interval: float = 60) -> List[ExtractionResult]:
         """
-        Reduce PDF size by extracting only first 2 and last 2 pages.
+        Extract several PDFs through one OpenAI Batch API job and wait for it to finish.
+
+        PDFs already in the extraction cache are answered locally; the rest are submitted
+        together and their successful results are written to the cache.
 
         Args:
-            pdf_path: Path to the original PDF file
+            pdf_paths: Paths to the PDF files
+            system_prompt: Optional custom system prompt (overrides default)
+            position_prompt: Optional custom position prompt (combined with system prompt)
+            poll_interval: Seconds to wait between batch status checks
 
         Returns:
-            Path to the reduced PDF file
+            List of ExtractionResult in the same order as pdf_paths
         """
-        try:
-            # Create temporary file for reduced PDF
-            temp_file = tempfile.NamedTemporaryFile(
-                suffix="_reduced.pdf",
-                delete=False,
-                dir=Path(pdf_path).parent
-            )
-            temp_path = temp_file.name
-            temp_file.close()
-
-            # Read the original PDF
-            reader = PdfReader(pdf_path)
-            writer = PdfWriter()
-            total_pages = len(reader.pages)
-
-            logger.info(f"Original PDF has {total_pages} pages")
-
-            # Handle edge cases
-            if total_pages <= 4:
-                # If PDF has 4 or fewer pages, use all pages
-                for page in reader.pages:
-                    writer.add_page(page)
-                logger.info("PDF has 4 or fewer pages, using all pages")
+        results = {}
+        pending = {}
+        for pdf_path in pdf_paths:
+            try:
+                pdf_bytes = Path(pdf_path).read_bytes()
+            except OSError as e:
+                results[pdf_path] = self._failed_result([f"Failed to read PDF: {str(e)}"], [])
+                continue
+
+            digest = hashlib.sha256(pdf_bytes).hexdigest()
+            cache_key, cached_result = self._check_cache(digest, pdf_path, system_prompt, position_prompt)
+            if cached_result:
+                results[pdf_path] = cached_result
+                continue
+
+            # Upload here so one unusable PDF fails on its own instead of aborting the whole batch;
+            # only the file ID and cache key are kept, not the PDF bytes, while the batch runs
+            errors = []
+            file_id = self._upload_for_batch(pdf_path, pdf_bytes, digest, errors)
+            if file_id:
+                pending[pdf_path] = (file_id, cache_key)
             else:
-                # Extract first 2 pages
-                for i in range(min(2, total_pages)):
-                    writer.add_page(reader.pages[i])
-                logger.info(f"Added first {min(2, total_pages)} pages")
+                results[pdf_path] = self._failed_result(errors, [])
 
-                # Extract last 2 pages
-                for i in range(max(0, total_pages - 2), total_pages):
-                    writer.add_page(reader.pages[i])
-                logger.info(f"Added last 2 pages (pages {total_pages-1} and {total_pages})")
+        if pending:
+            # Identical PDFs share one upload and one request; the Batch API rejects duplicate custom_ids
+            custom_ids = {}
+            for pdf_path, (file_id, _) in pending.items():
+                custom_ids.setdefault(file_id, pdf_path)
 
-            # Write the reduced PDF
-            with open(temp_path, "wb") as f:
-                writer.write(f)
+            try:
+                batch_id = self._create_batch_job(custom_ids, system_prompt, position_prompt)
+            except Exception as e:
+                logger.error(f"Batch submission failed: {str(e)}")
+                for pdf_path in pending:
+                    results[pdf_path] = self._failed_result([f"Batch submission failed: {str(e)}"], [])
+                return [results[pdf_path] for pdf_path in pdf_paths]
+
+            status, batch_results = self.retrieve_batch(batch_id)
+            while batch_results is None and status not in ("failed", "expired", "cancelled"):
+                time.sleep(poll_interval)
+                status, batch_results = self.retrieve_batch(batch_id)
+
+            for pdf_path, (file_id, cache_key) in pending.items():
+                result = (batch_results or {}).get(file_id)
+                if result is None:
+                    result = self._failed_result([f"No result for {pdf_path} in batch {batch_id} ({status})"], [])
+                else:
+                    # Identical PDFs share one batch result, so give each path its own copy
+                    result = replace(result, metadata={**result.metadata, "pdf_path": pdf_path})
+                    self._store_cached_result(cache_key, result)
+                results[pdf_path] = result
+
+        return [results[pdf_path] for pdf_path in pdf_paths]
+
+    def _prepare_pdf(self, pdf_bytes: bytes, errors: List[str], warnings: List[str]) -> Tuple[float, Optional[BytesIO]]:
+        """
+        Check file size and reduce the PDF if necessary.
+
+        Returns:
+            Tuple of (original file size in MB, buffer holding the reduced PDF or None)
+        """
+        file_size_mb = len(pdf_bytes) / (1024 * 1024)
+        pdf_config = self.config.get("pdf_reduction", {})
+        reduction_enabled = pdf_config.get("enabled", True)
+        max_size_mb = pdf_config.get("max_file_size_mb", 50)
+
+        logger.info(f"PDF file size: {file_size_mb:.2f}MB")
+        logger.info(f"PDF reduction enabled: {reduction_enabled}, threshold: {max_size_mb}MB")
+
+        if not (reduction_enabled and file_size_mb > max_size_mb):
+            return file_size_mb, None
+
+        logger.info(f"PDF size exceeds threshold ({max_size_mb}MB), reducing size...")
+        try:
+            reduced_pdf = self._reduce_pdf_size(pdf_bytes)
+            reduced_size_mb = reduced_pdf.getbuffer().nbytes / (1024 * 1024)
+            warnings.append(f"PDF was reduced from {file_size_mb:.2f}MB to {reduced_size_mb:.2f}MB")
+            return file_size_mb, reduced_pdf
+        except Exception as reduce_error:
+            logger.error(f"Failed to reduce PDF size: {str(reduce_error)}")
+            errors.append(f"PDF size reduction failed: {str(reduce_error)}")
+            return file_size_mb, None
+
+    def _check_cache(self, pdf_digest: str, pdf_path: str, system_prompt: str = None,
+                     position_prompt: str = None) -> Tuple[Optional[str], Optional[ExtractionResult]]:
+        """
+        Look up a cached extraction for this PDF, prompts, schema and model.
+
+        Returns:
+            Tuple of (cache key or None if caching is disabled, cached ExtractionResult or None)
+        """
+        if self.cache is None:
+            return None, None
+
+        cache_key = self._cache_key(pdf_digest, system_prompt or self.system_prompt, position_prompt or "")
+        memory_key = (cache_key, self.model, PROMPT_VERSION)
+        with _MEMORY_CACHE_LOCK:
+            entry = _MEMORY_CACHE.get(memory_key)
+            if entry is not None and self.cache_ttl_seconds is not None and time.time() - entry[1] >= self.cache_ttl_seconds:
+                # Expired by the same TTL as the SQLite row, so a long-running process stops serving it too
+                del _MEMORY_CACHE[memory_key]
+                entry = None
+            if entry is not None:
+                _MEMORY_CACHE.move_to_end(memory_key)
+
+        if entry is None:
+            cached = self.cache.get(cache_key, self.model)
+            if cached is None:
+                return cache_key, None
+
+            # Revalidate the cached data against the top-level schema keys
+            try:
+                data = _json_loads(cached.response)
+            except json.JSONDecodeError:
+                data = None
+            required_keys = self.output_schema.get("required", [])
+            if not isinstance(data, dict) or any(key not in data for key in required_keys):
+                logger.warning(f"Ignoring cache entry with invalid data: {cache_key}")
+                return cache_key, None
+
+            entry = (data, cached.created_at)
+            self._remember_in_memory(memory_key, entry)
+
+        data, created_at = entry
+        logger.info(f"Using cached extraction: {cache_key}")
+        return cache_key, ExtractionResult(
+            success=True,
+            # Callers get their own copy so they cannot alter the in-process cache
+            data=copy.deepcopy(data),
+            errors=[],
+            warnings=[],
+            metadata={
+                "extraction_timestamp": datetime.fromtimestamp(created_at).isoformat(),
+                "pdf_path": pdf_path,
+                "model_used": self.model,
+                "total_transactions": len(data.get('transactions', [])),
+                "validation_errors": 0,
+                "cache_hit": True
+            }
+        )
+
+    def _store_cached_result(self, cache_key: Optional[str], result: ExtractionResult):
+        """Write a successful extraction to the cache."""
+        if not cache_key or not result.success:
+            return
+
+        self.cache.set(cache_key, self.model, _json_dumps(result.data), ttl=self.cache_ttl_seconds)
+        self._remember_in_memory((cache_key, self.model, PROMPT_VERSION), (copy.deepcopy(result.data), int(time.time())))
+
+    def _remember_in_memory(self, memory_key: Tuple[str, str, str], entry: Tuple[Dict[str, Any], int]):
+        """Add a parsed extraction to the in-process LRU, evicting the least recently used one when full."""
+        with _MEMORY_CACHE_LOCK:
+            _MEMORY_CACHE[memory_key] = entry
+            _MEMORY_CACHE.move_to_end(memory_key)
+            if len(_MEMORY_CACHE) > _MEMORY_CACHE_MAX:
+                _MEMORY_CACHE.popitem(last=False)
+
+    def _cache_key(self, pdf_digest: str, system_prompt: str, position_prompt: str) -> str:
+        """Hash the PDF digest, prompts and schema into a cache key; the model and PROMPT_VERSION are separate cache columns."""
+        fields = [
+            pdf_digest.encode("ascii"),
+            system_prompt.encode("utf-8"),
+            position_prompt.encode("utf-8"),
+            self.schema_text.encode("utf-8")
+        ]
+
+        # Length-prefix each field so field boundaries cannot collide
+        digest = hashlib.sha256()
+        for field in fields:
+            digest.update(len(field).to_bytes(8, "big"))
+            digest.update(field)
+        return digest.hexdigest()
+
+    def _remember_upload(self, digest: str, file_id: str, file_size_mb: float, reduced_pdf: Optional[BytesIO]) -> Optional[float]:
+        """Record an uploaded file ID under the PDF digest and return the reduced size in MB, if any."""
+        reduced_size_mb = None if reduced_pdf is None else reduced_pdf.getbuffer().nbytes / (1024 * 1024)
+        _FILE_ID_CACHE[(self.api_key, digest)] = (file_id, file_size_mb, reduced_size_mb)
+        return reduced_size_mb
+
+    def _forget_upload(self, file_id: str):
+        """Stop reusing an uploaded file ID, e.g. after OpenAI rejected it because the file was deleted."""
+        for key, (cached_file_id, _, _) in list(_FILE_ID_CACHE.items()):
+            if key[0] == self.api_key and cached_file_id == file_id:
+                del _FILE_ID_CACHE[key]
+                logger.warning(f"Forgot uploaded file {file_id}; the PDF will be uploaded again next time")
+
+    def clear_uploaded_files(self) -> int:
+        """
+        Delete every PDF uploaded by this process with this API key from OpenAI and forget the file IDs.
+
+        Returns:
+            Number of files deleted
+        """
+        deleted = 0
+        for key, (file_id, _, _) in list(_FILE_ID_CACHE.items()):
+            if key[0] != self.api_key:
+                continue
+            try:
+                self.client.files.delete(file_id)
+                deleted += 1
+            except Exception as e:
+                logger.warning(f"Failed to delete uploaded file {file_id}: {str(e)}")
+            del _FILE_ID_CACHE[key]
+        logger.info(f"Deleted {deleted} uploaded files")
+        return deleted
+
+    def _build_result(self, extracted_data: Dict[str, Any], errors: List[str], warnings: List[str], pdf_path: str,
+                      file_id: str, file_size_mb: float, reduced_size_mb: Optional[float]) -> ExtractionResult:
+        """Validate extracted data and assemble the ExtractionResult with metadata."""
+        # Validate the extracted data
+        validation_errors = self._validate_extracted_data(extracted_data)
+        errors.extend(validation_errors)
+
+        success = len(errors) == 0
+
+        # Create metadata
+        metadata = {
+            "extraction_timestamp": datetime.now().isoformat(),
+            "pdf_path": pdf_path,
+            "model_used": self.model,
+            "file_id": file_id,
+            "total_transactions": len(extracted_data.get('transactions', [])),
+            "validation_errors": len(errors),
+            "original_file_size_mb": file_size_mb,
+            "file_reduced": reduced_size_mb is not None
+        }
+
+        if reduced_size_mb is not None:
+            metadata["reduced_file_size_mb"] = reduced_size_mb
+
+        return ExtractionResult(
+            success=success,
+            data=extracted_data,
+            errors=errors,
+            warnings=warnings,
+            metadata=metadata
+        )
+
+    def _failed_result(self, errors: List[str], warnings: List[str]) -> ExtractionResult:
+        """Build an ExtractionResult for an extraction that stopped early."""
+        return ExtractionResult(
+            success=False,
+            data={},
+            errors=errors,
+            warnings=warnings,
+            metadata={}
+        )
+
+    def _exception_result(self, error: Exception, warnings: List[str], pdf_path: str) -> ExtractionResult:
+        """Build an ExtractionResult for an extraction that raised."""
+        logger.error(f"Extraction failed: {str(error)}")
+        return ExtractionResult(
+            success=False,
+            data={},
+            errors=[f"Extraction failed: {str(error)}"],
+            warnings=warnings,
+            metadata={
+                "pdf_path": pdf_path,
+                "extraction_timestamp": datetime.now().isoformat()
+            }
+        )
+
+    def _reduce_pdf_size(self, pdf_bytes: bytes) -> BytesIO:
+        """
+        Reduce PDF size by extracting only first 2 and last 2 pages.
+
+        Uses PyMuPDF when it is installed and pypdf otherwise. The reduced PDF
+        is written to an in-memory buffer that is handed to the upload as-is.
+
+        Args:
+            pdf_bytes: Contents of the original PDF file
+
+        Returns:
+            Buffer holding the reduced PDF, positioned at the start
+        """
+        try:
+            if pymupdf is not None:
+                reduced_pdf = self._reduce_with_pymupdf(pdf_bytes)
+            else:
+                reduced_pdf = self._reduce_with_pypdf(pdf_bytes)
 
             # Check file size reduction
-            original_size = os.path.getsize(pdf_path)
-            reduced_size = os.path.getsize(temp_path)
+            original_size = len(pdf_bytes)
+            reduced_size = reduced_pdf.getbuffer().nbytes
             reduction_pct = (1 - reduced_size / original_size) * 100
 
             logger.info(f"PDF size reduced from {original_size:,} to {reduced_size:,} bytes ({reduction_pct:.1f}% reduction)")
-            logger.info(f"Reduced PDF saved to: {temp_path}")
 
-            return temp_path
+            return reduced_pdf
 
         except Exception as e:
             logger.error(f"Failed to reduce PDF size: {str(e)}")
             raise
 
-    def _cleanup_temp_file(self, file_path: str):
-        """Clean up temporary files."""
+    def _reduce_with_pymupdf(self, pdf_bytes: bytes) -> BytesIO:
+        """Keep the selected pages with PyMuPDF and garbage-collect unused objects."""
+        with pymupdf.open(stream=pdf_bytes, filetype="pdf") as document:
+            document.select(self._pages_to_keep(document.page_count))
+            return BytesIO(document.tobytes(garbage=4, deflate=True, clean=True))
+
+    def _reduce_with_pypdf(self, pdf_bytes: bytes) -> BytesIO:
+        """Copy the selected pages into a new PDF with pypdf."""
+        # Read the original PDF straight from memory, tolerating minor structural errors
+        reader = PdfReader(BytesIO(pdf_bytes), strict=False)
+        writer = PdfWriter()
+
+        # Read the page count from the page tree root instead of flattening every page
+        total_pages = int(reader.trailer["/Root"]["/Pages"]["/Count"])
+
+        # Copy the selected pages in one pass so shared resources are resolved once
+        writer.append(reader, pages=self._pages_to_keep(total_pages), import_outline=False)
+
+        # Write the reduced PDF
+        reduced_pdf = BytesIO()
+        writer.write(reduced_pdf)
+        reduced_pdf.seek(0)
+        return reduced_pdf
+
+    def _pages_to_keep(self, total_pages: int) -> List[int]:
+        """Select the zero-based pages kept when reducing a PDF."""
+        logger.info(f"Original PDF has {total_pages} pages")
+
+        # Handle edge cases
+        if total_pages <= 4:
+            # If PDF has 4 or fewer pages, use all pages
+            logger.info("PDF has 4 or fewer pages, using all pages")
+            return list(range(total_pages))
+
+        # Keep first 2 and last 2 pages
+        logger.info(f"Keeping first 2 and last 2 pages (pages 1, 2, {total_pages-1} and {total_pages})")
+        return [0, 1, total_pages - 2, total_pages - 1]
+
+    def _upload_pdf(self, pdf_bytes: Union[bytes, BinaryIO], filename: str) -> Optional[str]:
+        """Upload in-memory PDF bytes or buffer to OpenAI without touching disk."""
         try:
-            if os.path.exists(file_path):
-                os.unlink(file_path)
-                logger.info(f"Cleaned up temporary file: {file_path}")
+            uploaded_file = self.client.files.create(
+                file=(filename, pdf_bytes, "application/pdf"),
+                purpose="user_data"
+            )
+            logger.info(f"PDF uploaded successfully: {uploaded_file.id}")
+            return uploaded_file.id
         except Exception as e:
-            logger.warning(f"Failed to clean up temporary file {file_path}: {str(e)}")
+            logger.error(f"Failed to upload PDF: {str(e)}")
+            return None
 
-    def _upload_pdf(self, pdf_path: str) -> Optional[str]:
-        """Upload PDF file to OpenAI."""
+    async def _upload_pdf_async(self, client: AsyncOpenAI, pdf_bytes: Union[bytes, BinaryIO], filename: str) -> Optional[str]:
+        """Upload in-memory PDF bytes or buffer to OpenAI using the async client."""
         try:
-            with open(pdf_path, "rb") as file:
-                uploaded_file = self.client.files.create(
-                    file=file,
-                    purpose="user_data"
-                )
+            uploaded_file = await client.files.create(
+                file=(filename, pdf_bytes, "application/pdf"),
+                purpose="user_data"
+            )
             logger.info(f"PDF uploaded successfully: {uploaded_file.id}")
             return uploaded_file.id
         except Exception as e:
@@ -320,130 +1007,261 @@ class ISECAPIExtractor:
     def _extract_with_openai(self, file_id: str, system_prompt: str = None, position_prompt: str = None) -> Dict[str, Any]:
         """Extract data using OpenAI API."""
         try:
-            # Prepare the extraction prompt
-            extraction_prompt = self._prepare_extraction_prompt()
-
-            # Use custom prompts if provided, otherwise use default
-            effective_system_prompt = system_prompt if system_prompt else self.system_prompt
-
-            # Combine system prompt and position prompt if both are provided
-            if position_prompt:
-                effective_system_prompt = f"{effective_system_prompt}\n\n{position_prompt}"
-
-            # Prepare request parameters based on model type
-            request_params = {
-                "model": self.model,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": effective_system_prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "file",
-                                "file": {
-                                    "file_id": file_id
-                                }
-                            },
-                            {
-                                "type": "text",
-                                "text": extraction_prompt,
-                            }
-                        ]
-                    }
-                ]
-            }
+            request_params = self._build_request_params(file_id, system_prompt, position_prompt)
+            max_retries = self.config["extraction"].get("validation_retries", 0)
 
-            # Add model-specific parameters
-            if self.model.startswith("gpt-5"):
-                # GPT-5 models use max_completion_tokens instead of max_tokens
-                request_params["max_completion_tokens"] = self.config["openai"]["max_tokens"]
-                # Note: temperature is not supported by GPT-5 models in Chat Completions API
-            else:
-                # Legacy models use max_tokens and temperature
-                request_params["max_tokens"] = self.config["openai"]["max_tokens"]
-                request_params["temperature"] = self.config["openai"].get("temperature", 0.1)
-
-            # Create the extraction request
-            response = self.client.chat.completions.create(**request_params)
-
-            # Parse the response
-            response_text = response.choices[0].message.content
-            logger.info(f"OpenAI response received: {len(response_text)} characters")
-
-            # Debug: Check if response is empty or None
-            if not response_text:
-                logger.warning("Empty response received from OpenAI")
-                logger.warning(f"Response object: {response}")
-                logger.warning(f"Choices: {response.choices}")
-                logger.warning(f"Choice 0: {response.choices[0] if response.choices else 'No choices'}")
-                if response.choices:
-                    logger.warning(f"Message: {response.choices[0].message}")
-                    logger.warning(f"Content: {response.choices[0].message.content}")
-                    logger.warning(f"Finish reason: {response.choices[0].finish_reason}")
-
-                # Check usage information
-                if hasattr(response, 'usage') and response.usage:
-                    logger.info(f"Token usage: {response.usage}")
-
-                # If GPT-5 returns empty response, try fallback to GPT-4o
-                if self.model.startswith("gpt-5"):
-                    logger.warning(f"GPT-5 model {self.model} returned empty response, trying fallback to gpt-4o")
-                    fallback_params = request_params.copy()
-                    fallback_params["model"] = "gpt-4o"
-                    # Add back temperature and max_tokens for GPT-4o
-                    fallback_params["max_tokens"] = self.config["openai"]["max_tokens"]
-                    fallback_params["temperature"] = self.config["openai"].get("temperature", 0.1)
-                    # Remove GPT-5 specific parameters
-                    if "max_completion_tokens" in fallback_params:
-                        del fallback_params["max_completion_tokens"]
-
-                    try:
-                        logger.info("Attempting fallback extraction with GPT-4o...")
-                        fallback_response = self.client.chat.completions.create(**fallback_params)
-                        fallback_response_text = fallback_response.choices[0].message.content
-                        logger.info(f"Fallback response received: {len(fallback_response_text)} characters")
-
-                        if fallback_response_text:
-                            extracted_data = self._parse_json_response(fallback_response_text)
-                            logger.info("Successfully used GPT-4o fallback")
-                            return extracted_data
-                        else:
-                            logger.error("Fallback model also returned empty response")
-                    except Exception as fallback_error:
-                        logger.error(f"Fallback extraction failed: {str(fallback_error)}")
+            for attempt in range(max_retries + 1):
+                # Create the extraction request
+                response = self.client.chat.completions.create(**request_params)
+                self._log_usage(response)
 
-                return {}
+                # Parse the response
+                response_text = response.choices[0].message.content
+                logger.info(f"OpenAI response received: {len(response_text)} characters")
 
-            # Extract JSON from response
-            extracted_data = self._parse_json_response(response_text)
+                if not response_text:
+                    self._log_empty_response(response)
 
-            return extracted_data
+                    # If GPT-5 returns empty response, try fallback to GPT-4o
+                    if self.model.startswith("gpt-5"):
+                        logger.warning(f"GPT-5 model {self.model} returned empty response, trying fallback to gpt-4o")
+                        fallback_params = self._build_fallback_params(request_params)
+
+                        try:
+                            logger.info("Attempting fallback extraction with GPT-4o...")
+                            fallback_response = self.client.chat.completions.create(**fallback_params)
+                            return self._parse_fallback_response(fallback_response)
+                        except Exception as fallback_error:
+                            logger.error(f"Fallback extraction failed: {str(fallback_error)}")
+
+                    return {}
+
+                # Extract JSON from response
+                extracted_data = self._parse_json_response(response_text)
+
+                # Feed validation errors back to the model and retry
+                validation_errors = self._validate_extracted_data(extracted_data)
+                if not validation_errors or attempt == max_retries:
+                    return extracted_data
+
+                logger.warning(f"Extraction had {len(validation_errors)} validation errors, retrying with feedback ({attempt + 1}/{max_retries})")
+                request_params["messages"] = request_params["messages"] + self._build_feedback_messages(response_text, validation_errors)
 
         except Exception as e:
-            error_msg = str(e)
-            logger.error(f"OpenAI extraction failed: {error_msg}")
+            self._log_extraction_error(e)
+            # A deleted or otherwise unusable file is rejected on every later request too
+            if isinstance(e, (BadRequestError, NotFoundError)):
+                self._forget_upload(file_id)
+            return {}
+
+    async def _extract_with_openai_async(self, client: AsyncOpenAI, file_id: str, system_prompt: str = None,
+                                         position_prompt: str = None) -> Dict[str, Any]:
+        """Extract data using the async OpenAI client."""
+        try:
+            request_params = self._build_request_params(file_id, system_prompt, position_prompt)
+            max_retries = self.config["extraction"].get("validation_retries", 0)
+
+            # Count the prompt once; validation retries only add the tokens of their feedback messages
+            prompt_tokens = self._system_prompt_tokens_for(request_params["messages"][0]["content"]) + self.extraction_prompt_tokens
+
+            for attempt in range(max_retries + 1):
+                # Create the extraction request
+                await self.token_bucket.acquire(prompt_tokens + self._max_output_tokens(request_params))
+                response = await client.chat.completions.create(**request_params)
+                self._log_usage(response)
+
+                # Parse the response
+                response_text = response.choices[0].message.content
+                logger.info(f"OpenAI response received: {len(response_text)} characters")
+
+                if not response_text:
+                    self._log_empty_response(response)
 
-            # Check if it's a token limit error and suggest fallback
-            if "token size" in error_msg.lower() or "exceeds the maximum limit" in error_msg.lower():
-                logger.error("PDF file too large for OpenAI API. Suggest using traditional extractor (extractor.py) instead.")
-                logger.error("Example: python extractor.py both.pdf -o both_traditional.json")
+                    # If GPT-5 returns empty response, try fallback to GPT-4o
+                    if self.model.startswith("gpt-5"):
+                        logger.warning(f"GPT-5 model {self.model} returned empty response, trying fallback to gpt-4o")
+                        fallback_params = self._build_fallback_params(request_params)
 
+                        try:
+                            logger.info("Attempting fallback extraction with GPT-4o...")
+                            await self.token_bucket.acquire(prompt_tokens + self._max_output_tokens(fallback_params))
+                            fallback_response = await client.chat.completions.create(**fallback_params)
+                            return self._parse_fallback_response(fallback_response)
+                        except Exception as fallback_error:
+                            logger.error(f"Fallback extraction failed: {str(fallback_error)}")
+
+                    return {}
+
+                # Extract JSON from response
+                extracted_data = self._parse_json_response(response_text)
+
+                # Feed validation errors back to the model and retry
+                validation_errors = self._validate_extracted_data(extracted_data)
+                if not validation_errors or attempt == max_retries:
+                    return extracted_data
+
+                logger.warning(f"Extraction had {len(validation_errors)} validation errors, retrying with feedback ({attempt + 1}/{max_retries})")
+                feedback_messages = self._build_feedback_messages(response_text, validation_errors)
+                prompt_tokens += await asyncio.to_thread(self._count_tokens, "\n".join(message["content"] for message in feedback_messages))
+                request_params["messages"] = request_params["messages"] + feedback_messages
+
+        except Exception as e:
+            self._log_extraction_error(e)
+            # A deleted or otherwise unusable file is rejected on every later request too
+            if isinstance(e, (BadRequestError, NotFoundError)):
+                self._forget_upload(file_id)
             return {}
 
+    def _build_request_params(self, file_id: str, system_prompt: str = None, position_prompt: str = None) -> Dict[str, Any]:
+        """Build chat completion request parameters for an uploaded PDF."""
+        # Use custom prompts if provided, otherwise use default
+        effective_system_prompt = system_prompt if system_prompt else self.system_prompt
+
+        # Combine system prompt and position prompt if both are provided
+        if position_prompt:
+            effective_system_prompt = f"{effective_system_prompt}\n\n{position_prompt}"
+
+        # Prepare request parameters based on model type. Static text comes first and the
+        # per-PDF file last, so OpenAI's prompt caching can reuse the identical prefix across PDFs
+        request_params = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": effective_system_prompt
+                },
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": self.extraction_prompt,
+                        },
+                        {
+                            "type": "file",
+                            "file": {
+                                "file_id": file_id
+                            }
+                        }
+                    ]
+                }
+            ]
+        }
+
+        # Add model-specific parameters
+        if self.model.startswith("gpt-5"):
+            # GPT-5 models use max_completion_tokens instead of max_tokens
+            request_params["max_completion_tokens"] = self.config["openai"]["max_tokens"]
+            # Note: temperature is not supported by GPT-5 models in Chat Completions API
+        else:
+            # Legacy models use max_tokens and temperature
+            request_params["max_tokens"] = self.config["openai"]["max_tokens"]
+            request_params["temperature"] = self.config["openai"].get("temperature", 0.1)
+
+        # Let the API enforce the output schema so responses are bare, parseable JSON
+        if self.structured_outputs:
+            request_params["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "isec_contract_note",
+                    "schema": self.response_schema,
+                    "strict": True
+                }
+            }
+
+        return request_params
+
+    def _build_feedback_messages(self, response_text: str, validation_errors: List[str]) -> List[Dict[str, Any]]:
+        """Build follow-up messages asking the model to fix validation errors in its previous output."""
+        error_summary = "; ".join(validation_errors[:20])
+        return [
+            {"role": "assistant", "content": response_text},
+            {"role": "user", "content": f"Your output had errors: {error_summary}. Fix them and return the corrected JSON only."}
+        ]
+
+    def _system_prompt_tokens_for(self, system_text: str) -> int:
+        """Return the token count of a request's system message, encoding each distinct prompt only once."""
+        if system_text == self.system_prompt:
+            return self.system_prompt_tokens
+        if system_text not in self._system_prompt_token_counts:
+            self._system_prompt_token_counts[system_text] = self._count_tokens(system_text)
+        return self._system_prompt_token_counts[system_text]
+
+    def _max_output_tokens(self, request_params: Dict[str, Any]) -> int:
+        """Return the output token limit a request counts against the rate limit."""
+        return request_params.get("max_completion_tokens") or request_params.get("max_tokens", 0)
+
+    def _build_fallback_params(self, request_params: Dict[str, Any]) -> Dict[str, Any]:
+        """Build GPT-4o fallback request parameters from a GPT-5 request."""
+        fallback_params = request_params.copy()
+        fallback_params["model"] = "gpt-4o"
+        # Add back temperature and max_tokens for GPT-4o
+        fallback_params["max_tokens"] = self.config["openai"]["max_tokens"]
+        fallback_params["temperature"] = self.config["openai"].get("temperature", 0.1)
+        # Remove GPT-5 specific parameters
+        if "max_completion_tokens" in fallback_params:
+            del fallback_params["max_completion_tokens"]
+        return fallback_params
+
+    def _parse_fallback_response(self, fallback_response: Any) -> Dict[str, Any]:
+        """Parse the response of the GPT-4o fallback request."""
+        fallback_response_text = fallback_response.choices[0].message.content
+        logger.info(f"Fallback response received: {len(fallback_response_text)} characters")
+
+        if fallback_response_text:
+            extracted_data = self._parse_json_response(fallback_response_text)
+            logger.info("Successfully used GPT-4o fallback")
+            return extracted_data
+
+        logger.error("Fallback model also returned empty response")
+        return {}
+
+    def _log_usage(self, response: Any):
+        """Log prompt token usage, including how many tokens OpenAI served from its prompt cache."""
+        usage = getattr(response, "usage", None)
+        if not usage:
+            return
+        cached_tokens = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None) or 0
+        logger.info(f"Prompt tokens: {usage.prompt_tokens}, cached: {cached_tokens}")
+
+    def _log_empty_response(self, response: Any):
+        """Log diagnostics for an empty OpenAI response."""
+        logger.warning("Empty response received from OpenAI")
+        logger.warning(f"Response object: {response}")
+        logger.warning(f"Choices: {response.choices}")
+        logger.warning(f"Choice 0: {response.choices[0] if response.choices else 'No choices'}")
+        if response.choices:
+            logger.warning(f"Message: {response.choices[0].message}")
+            logger.warning(f"Content: {response.choices[0].message.content}")
+            logger.warning(f"Finish reason: {response.choices[0].finish_reason}")
+
+        # Check usage information
+        if hasattr(response, 'usage') and response.usage:
+            logger.info(f"Token usage: {response.usage}")
+
+    def _log_extraction_error(self, error: Exception):
+        """Log an OpenAI extraction failure."""
+        error_msg = str(error)
+        logger.error(f"OpenAI extraction failed: {error_msg}")
+
+        # Check if it's a token limit error and suggest fallback
+        if "token size" in error_msg.lower() or "exceeds the maximum limit" in error_msg.lower():
+            logger.error("PDF file too large for OpenAI API. Suggest using traditional extractor (extractor.py) instead.")
+            logger.error("Example: python extractor.py both.pdf -o both_traditional.json")
+
     def _prepare_extraction_prompt(self) -> str:
         """Prepare the extraction prompt for OpenAI."""
-        # Create compact prompt
-        schema_text = json.dumps(self.output_schema, separators=(',', ':'))
+        # With structured outputs the schema is sent in response_format, so don't pay for it again in the prompt
+        if self.structured_outputs:
+            return "Extract ISEC contract note data. Return JSON only."
 
+        # Create compact prompt
         prompt = f"""Extract ISEC contract note data. Return JSON only:
 
-{schema_text}"""
+{self.schema_text}"""
 
         # Check prompt length
-        if self._check_prompt_length(prompt + self.system_prompt):
+        if self._check_prompt_length(prompt):
             logger.info("Using optimized prompt (compact)")
             return prompt
         else:
@@ -451,57 +1269,79 @@ class ISECAPIExtractor:
             return self._prepare_ultra_compact_prompt()
 
     def _check_prompt_length(self, prompt_text: str) -> bool:
-        """Check if prompt is within acceptable token limits."""
-        # Rough estimation: 1 token ≈ 4 characters
-        estimated_tokens = len(prompt_text) // 4
+        """Check if prompt plus the system prompt is within acceptable token limits."""
+        estimated_tokens = self._count_tokens(prompt_text) + self.system_prompt_tokens
         max_tokens = self.config["extraction"]["max_prompt_tokens"]
 
         logger.info(f"Estimated prompt tokens: {estimated_tokens}, max: {max_tokens}")
         return estimated_tokens <= max_tokens
 
+    def _load_token_encoding(self) -> Optional[Any]:
+        """Load the tiktoken encoding for the model once, or None to fall back to the length heuristic."""
+        if tiktoken is None:
+            return None
+        try:
+            try:
+                return tiktoken.encoding_for_model(self.model)
+            except KeyError:
+                return tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            # Encodings are downloaded on first use; keep the heuristic if that fails
+            logger.warning(f"tiktoken encoding unavailable, estimating tokens from length: {str(e)}")
+            return None
+
+    def _count_tokens(self, text: str) -> int:
+        """Count tokens with the cached tiktoken encoding, or estimate 1 token per 4 characters."""
+        if self.token_encoding is None:
+            return len(text) // 4
+        return len(self.token_encoding.encode(text))
+
     def _prepare_ultra_compact_prompt(self) -> str:
         """Prepare ultra-compact prompt for very large files."""
         return "Extract ISEC contract note data. Return JSON with header, transactions, obligations."
 
     def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
         """Parse JSON from OpenAI response text."""
+        # Most responses are bare JSON; only fall back to cleaning when they are not
         try:
-            # Clean the response text first
-            cleaned_text = self._clean_response_text(response_text)
-            logger.info(f"Original response length: {len(response_text)}, Cleaned length: {len(cleaned_text)}")
+            return _json_loads(response_text)
+        except json.JSONDecodeError:
+            pass
 
+        # Clean the response text once; every fallback below reuses it
+        cleaned_text = self._clean_response_text(response_text)
+        logger.debug(f"Original response length: {len(response_text)}, Cleaned length: {len(cleaned_text)}")
+
+        try:
             # Try to extract JSON from the response
             # Look for JSON pattern in the text
-            json_pattern = r'\{[\s\S]*\}'
-            match = re.search(json_pattern, cleaned_text)
+            match = _JSON_OBJECT_RE.search(cleaned_text)
 
             if match:
                 json_str = match.group(0)
                 # Try to fix any truncation issues
                 json_str = self._fix_truncated_json(json_str)
 
-                data = json.loads(json_str)
-                logger.info("Successfully parsed JSON from response")
+                data = _json_loads(json_str)
+                logger.debug("Successfully parsed JSON from response")
                 return data
             else:
                 # If no JSON pattern found, try parsing the entire response
-                data = json.loads(cleaned_text.strip())
-                logger.info("Successfully parsed entire response as JSON")
+                data = _json_loads(cleaned_text.strip())
+                logger.debug("Successfully parsed entire response as JSON")
                 return data
 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON from response: {str(e)}")
             logger.error(f"Response text: {response_text[:1000]}...")
             # Try to show what we cleaned
-            cleaned_text = self._clean_response_text(response_text)
             logger.error(f"Cleaned text: {cleaned_text[:1000]}...")
 
             # Try one more time with aggressive cleaning
             try:
                 logger.info("Attempting aggressive JSON fix...")
-                cleaned_text = self._clean_response_text(response_text)
                 json_str = self._fix_truncated_json(cleaned_text)
-                data = json.loads(json_str)
+                data = _json_loads(json_str)
                 logger.info("Successfully parsed JSON with aggressive fix")
                 return data
             except Exception as retry_e:
@@ -510,60 +1350,82 @@ class ISECAPIExtractor:
 
     def _clean_response_text(self, response_text: str) -> str:
         """Clean response text by removing markdown code blocks and other formatting."""
-        logger.info(f"Cleaning response text, original length: {len(response_text)}")
-
-        # Remove markdown code blocks
-        if '```json' in response_text:
-            # Extract content between ```json and ```
-            pattern = r'```json\s*(.*?)\s*```'
-            match = re.search(pattern, response_text, re.DOTALL)
-            if match:
-                cleaned = match.group(1).strip()
-                logger.info(f"Found ```json block, cleaned length: {len(cleaned)}")
-                return cleaned
-
-        if '```' in response_text:
-            # Extract content between any ``` blocks
-            pattern = r'```\s*(.*?)\s*```'
-            match = re.search(pattern, response_text, re.DOTALL)
-            if match:
-                cleaned = match.group(1).strip()
-                logger.info(f"Found generic ``` block, cleaned length: {len(cleaned)}")
-                return cleaned
-
-        # Remove any remaining markdown formatting
-        cleaned = re.sub(r'```[a-zA-Z]*\s*', '', response_text)
-        cleaned = re.sub(r'\s*```\s*', '', cleaned)
-        cleaned = cleaned.strip()
-
-        logger.info(f"No markdown blocks found, returning stripped text, length: {len(cleaned)}")
+        # Per-response parser traces are debug-level so batch runs don't log them for every PDF
+        logger.debug(f"Cleaning response text, original length: {len(response_text)}")
+
+        # Find the first ``` fence with plain str.find scans; without one there is no markdown to strip
+        fence_start = response_text.find('```')
+        if fence_start < 0:
+            return response_text.strip()
+
+        # Skip the fence and an optional language tag such as "json"
+        body_start = fence_start + 3
+        while body_start < len(response_text) and response_text[body_start].isalpha():
+            body_start += 1
+
+        # An unclosed fence (e.g. a truncated response) runs to the end of the text
+        fence_end = response_text.find('```', body_start)
+        cleaned = (response_text[body_start:fence_end] if fence_end >= 0 else response_text[body_start:]).strip()
+        logger.debug(f"Found ``` block, cleaned length: {len(cleaned)}")
         return cleaned
 
     def _fix_truncated_json(self, json_str: str) -> str:
-        """Attempt to fix truncated JSON by finding the last complete object."""
+        """Attempt to fix JSON followed by trailing text by cutting it after the first complete object."""
+        json_str = json_str.lstrip()
         try:
-            # Find the last complete closing brace
-            brace_count = 0
-            last_complete_pos = -1
-
-            for i, char in enumerate(json_str):
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        last_complete_pos = i
-
-            if last_complete_pos > 0 and last_complete_pos < len(json_str) - 1:
-                # Truncate to the last complete object
-                fixed_json = json_str[:last_complete_pos + 1]
-                logger.info(f"Fixed truncated JSON, new length: {len(fixed_json)}")
-                return fixed_json
-            else:
+            # raw_decode parses in C, skips braces inside strings and reports where the value ends
+            _, end = _JSON_DECODER.raw_decode(json_str)
+        except json.JSONDecodeError:
+            # The response was cut off mid-value (e.g. out of completion tokens); keep what is complete
+            closed_json = self._close_truncated_json(json_str)
+            if closed_json is None:
                 return json_str
-        except Exception as e:
-            logger.error(f"Error fixing truncated JSON: {e}")
-            return json_str
+            logger.warning(f"Response JSON was truncated, recovered the first {len(closed_json)} of {len(json_str)} characters")
+            return closed_json
+
+        if end < len(json_str):
+            fixed_json = json_str[:end]
+            logger.debug(f"Fixed truncated JSON, new length: {len(fixed_json)}")
+            return fixed_json
+        return json_str
+
+    def _close_truncated_json(self, json_str: str) -> Optional[str]:
+        """
+        Cut truncated JSON back to its last complete element and close the open arrays and objects.
+
+        Returns None if no complete element was found.
+        """
+        closers = []
+        in_string = escaped = False
+        cut = None
+        for i, char in enumerate(json_str):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == '{':
+                closers.append('}')
+            elif char == '[':
+                closers.append(']')
+            elif char in '}]':
+                if not closers or closers.pop() != char:
+                    break
+                if not closers:
+                    return json_str[:i + 1]
+                cut = (i + 1, ''.join(reversed(closers)))
+            elif char == ',' and closers:
+                # Everything before a separator is a complete element of the enclosing container
+                cut = (i, ''.join(reversed(closers)))
+
+        if cut is None:
+            return None
+        end, closing = cut
+        return json_str[:end] + closing
 
     def _validate_extracted_data(self, data: Dict[str, Any]) -> List[str]:
         """Validate extracted data against schema and business rules."""
@@ -578,13 +1440,8 @@ class ISECAPIExtractor:
             errors.append("Missing header section")
         else:
             header = data['header']
-            required_header_fields = [
-                'contract_note_no', 'trade_date', 'settlement_no',
-                'settlement_date', 'client_id', 'client_name'
-            ]
-
-            for field in required_header_fields:
-                if field not in header or not header[field]:
+            for field in _REQUIRED_HEADER_FIELDS:
+                if not header.get(field):
                     errors.append(f"Missing required header field: {field}")
 
         # Validate transactions
@@ -617,7 +1474,7 @@ class ISECAPIExtractor:
         isin = transaction.get('isin', '')
         if not isin:
             errors.append(f"{prefix}: Missing ISIN")
-        elif not re.match(r'^[A-Z]{2}[0-9A-Z]{10}$', isin):
+        elif not _ISIN_RE.match(isin):
             errors.append(f"{prefix}: Invalid ISIN format: {isin}")
 
         # Check security name
@@ -625,20 +1482,15 @@ class ISECAPIExtractor:
             errors.append(f"{prefix}: Missing security name")
 
         # Validate numeric fields are actually numbers
-        numeric_fields = [
-            'buy_quantity', 'sell_quantity', 'total_quantity',
-            'buy_weighted_average_price', 'sell_weighted_average_price',
-            'buy_net_payable_receivable', 'sell_net_payable_receivable',
-            'total_net_payable_receivable'
-        ]
-
-        for field in numeric_fields:
+        for field in _NUMERIC_TRANSACTION_FIELDS:
             value = transaction.get(field)
-            if value is not None and not isinstance(value, (int, float)):
-                try:
-                    transaction[field] = float(value)
-                except (ValueError, TypeError):
-                    errors.append(f"{prefix}: Invalid numeric value for {field}: {value}")
+            if value is None:
+                continue
+            # float() is as cheap as a type check for numbers, so coerce every value
+            try:
+                transaction[field] = float(value)
+            except (ValueError, TypeError):
+                errors.append(f"{prefix}: Invalid numeric value for {field}: {value}")
 
         return errors
 
@@ -646,39 +1498,19 @@ class ISECAPIExtractor:
         """Validate obligations section."""
         errors = []
 
-        # Check required top-level fields
-        required_fields = [
-            'pay_out_obligation', 'taxable_value_of_supply',
-            'gst_details', 'securities_transaction_tax', 'stamp_duty',
-            'net_amount_receivable_by_client', 'net_amount_to_be_credited_in_bank'
-        ]
-
-        for field in required_fields:
-            if field not in obligations:
-                errors.append(f"Missing obligations field: {field}")
+        # Check required fields with set differences; sort the misses so error order is stable
+        missing = _REQUIRED_OBLIGATION_FIELDS.difference(obligations)
+        errors.extend(f"Missing obligations field: {field}" for field in sorted(missing))
 
         # Validate taxable value supply structure
         if 'taxable_value_of_supply' in obligations:
-            tvs = obligations['taxable_value_of_supply']
-            tvs_fields = ['total_brokerage', 'exchange_transaction_charges',
-                         'sebi_turnover_fees', 'total_taxable_value']
-
-            for field in tvs_fields:
-                if field not in tvs:
-                    errors.append(f"Missing taxable value field: {field}")
+            missing = _TAXABLE_VALUE_FIELDS.difference(obligations['taxable_value_of_supply'])
+            errors.extend(f"Missing taxable value field: {field}" for field in sorted(missing))
 
         # Validate GST details structure
         if 'gst_details' in obligations:
-            gst = obligations['gst_details']
-            gst_fields = [
-                'cgst_rate', 'cgst_brokerage_amount', 'cgst_charges_amount', 'cgst_total_amount',
-                'sgst_rate', 'sgst_brokerage_amount', 'sgst_charges_amount', 'sgst_total_amount',
-                'igst_rate', 'igst_brokerage_amount', 'igst_charges_amount', 'igst_total_amount'
-            ]
-
-            for field in gst_fields:
-                if field not in gst:
-                    errors.append(f"Missing GST detail field: {field}")
+            missing = _GST_DETAIL_FIELDS.difference(obligations['gst_details'])
+            errors.extend(f"Missing GST detail field: {field}" for field in sorted(missing))
 
         return errors
 
@@ -692,8 +1524,13 @@ class ISECAPIExtractor:
             "metadata": result.metadata
         }
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, default=str)
+        if orjson is not None:
+            # Serialize natively and write the file in one call; non-str keys are stringified like json.dump does
+            option = orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            Path(output_path).write_bytes(orjson.dumps(output_data, option=option, default=str))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(output_data, f, indent=2, default=str)
 
         logger.info(f"Results saved to: {output_path}")
 
@@ -705,7 +1542,7 @@ def main():
 
     # Load config to get defaults
     try:
-        config_path = Path(__file__).parent / 'config.json'
+        config_path = _BASE_DIR / 'config.json'
         with open(config_path, 'r', encoding='utf-8') as f:
             config = json.load(f)
     except FileNotFoundError:
@@ -713,13 +1550,40 @@ def main():
         return
 
     parser = argparse.ArgumentParser(description='Extract data from ISEC contract notes using OpenAI API')
-    parser.add_argument('pdf_path', help='Path to the PDF file')
-    parser.add_argument('-o', '--output', help='Output JSON file path',
+    parser.add_argument('pdf_paths', nargs='*', help='Path to one or more PDF files')
+    parser.add_argument('--batch', metavar='DIR', help='Also extract every *.pdf file in this directory')
+    parser.add_argument('--offline-batch', action='store_true',
+                       help='Submit the PDFs as one OpenAI Batch API job (about half price, can take up to 24 hours) and wait for it')
+    parser.add_argument('--concurrency', type=int,
+                       help=f'Maximum concurrent extractions for several PDFs (default: {config["extraction"].get("max_concurrency", 8)})')
+    parser.add_argument('-o', '--output', help='Output JSON file path; with several PDFs, each result is saved as <output stem>_<pdf stem>.json '
+                            '(with _1, _2, ... appended when PDF stems repeat)',
                        default='extracted_data_openai.json')
     parser.add_argument('-k', '--api-key', help='OpenAI API key (if not set in environment)')
     parser.add_argument('-m', '--model', help=f'OpenAI model to use (default: {config["openai"]["default_model"]})')
 
     args = parser.parse_args()
+    if args.batch:
+        args.pdf_paths += [str(path) for path in sorted(Path(args.batch).glob('*.pdf'))]
+    if not args.pdf_paths:
+        parser.error("no PDF files given; pass PDF paths or --batch DIR")
+
+    # Work out output files before extracting, so a name clash fails before any API calls
+    if len(args.pdf_paths) == 1:
+        output_paths = [args.output]
+    else:
+        output = Path(args.output)
+        # Number PDFs whose stems repeat (e.g. the same name in two directories) so their results don't overwrite each other
+        stems = [Path(pdf_path).stem for pdf_path in args.pdf_paths]
+        stem_counts = Counter(stems)
+        seen = Counter()
+        output_paths = []
+        for stem in stems:
+            seen[stem] += 1
+            suffix = f"_{seen[stem]}" if stem_counts[stem] > 1 else ""
+            output_paths.append(output.with_name(f"{output.stem}_{stem}{suffix}.json"))
+        if len(set(output_paths)) < len(output_paths):
+            parser.error("PDF names map to the same output file; rename the PDFs or use a different -o")
 
     # Initialize extractor
     try:
@@ -729,24 +1593,31 @@ def main():
         return
 
     # Extract data
-    logger.info(f"Extracting data from: {args.pdf_path}")
+    logger.info(f"Extracting data from: {', '.join(args.pdf_paths)}")
     logger.info(f"Using model: {extractor.model}")
 
-    result = extractor.extract_from_pdf(args.pdf_path)
-
-    # Save results
-    extractor.save_result(result, args.output)
-
-    # Print summary
-    if result.success:
-        logger.info("Extraction completed successfully")
-        logger.info(f"Extracted {len(result.data.get('transactions', []))} transactions")
-        logger.info(f"Client: {result.data.get('header', {}).get('client_name', 'N/A')}")
-        logger.info(f"Contract Note: {result.data.get('header', {}).get('contract_note_no', 'N/A')}")
+    if args.offline_batch:
+        results = extractor.extract_batch_offline(args.pdf_paths)
+    elif len(args.pdf_paths) == 1:
+        results = [extractor.extract_from_pdf(args.pdf_paths[0])]
     else:
-        logger.error("Extraction completed with errors")
-        for error in result.errors:
-            logger.error(f"Error: {error}")
+        # Several PDFs: overlap their uploads and completions on the async client
+        results = asyncio.run(extractor.extract_batch(args.pdf_paths, concurrency=args.concurrency))
+
+    for pdf_path, result, output_path in zip(args.pdf_paths, results, output_paths):
+        # Save results
+        extractor.save_result(result, output_path)
+
+        # Print summary
+        if result.success:
+            logger.info(f"Extraction completed successfully: {pdf_path}")
+            logger.info(f"Extracted {len(result.data.get('transactions', []))} transactions")
+            logger.info(f"Client: {result.data.get('header', {}).get('client_name', 'N/A')}")
+            logger.info(f"Contract Note: {result.data.get('header', {}).get('contract_note_no', 'N/A')}")
+        else:
+            logger.error(f"Extraction completed with errors: {pdf_path}")
+            for error in result.errors:
+                logger.error(f"Error: {error}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
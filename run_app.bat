@@ -10,7 +10,7 @@ REM Check if Python is installed
 python --version >nul 2>&1
 if errorlevel 1 (
     echo ERROR: Python is not installed or not in PATH
-    echo Please install Python 3.8 or higher
+    echo Please install Python 3.9 or higher
     pause
     exit /b 1
 )
@@ -27,10 +27,11 @@ if not exist .env (
     pause
 )
 
-REM Check if streamlit is installed
-python -c "import streamlit" >nul 2>&1
+REM Check if every package in requirements.txt is installed
+REM check_requirements.py scans installed distribution metadata; no package code is imported
+python check_requirements.py >nul 2>&1
 if errorlevel 1 (
-    echo Streamlit not found. Installing dependencies...
+    echo Dependencies not found. Installing dependencies...
     pip install -r requirements.txt
     if errorlevel 1 (
         echo ERROR: Failed to install dependencies
@@ -9,7 +9,7 @@ echo ""
 # Check if Python is installed
 if ! command -v python3 &> /dev/null; then
     echo "ERROR: Python 3 is not installed or not in PATH"
-    echo "Please install Python 3.8 or higher"
+    echo "Please install Python 3.9 or higher"
     exit 1
 fi
 
@@ -25,9 +25,10 @@ if [ ! -f .env ]; then
     read -p "Press Enter to continue..."
 fi
 
-# Check if streamlit is installed
-if ! python3 -c "import streamlit" &> /dev/null; then
-    echo "Streamlit not found. Installing dependencies..."
+# Check if every package in requirements.txt is installed
+# check_requirements.py scans installed distribution metadata; no package code is imported
+if ! python3 check_requirements.py &> /dev/null; then
+    echo "Dependencies not found. Installing dependencies..."
     pip3 install -r requirements.txt
     if [ $? -ne 0 ]; then
         echo "ERROR: Failed to install dependencies"